@@ -1,9 +1,12 @@
 # coding: utf-8
 import argparse
+import asyncio
+import functools
 import logging
 import os
 import re
 import peewee as pw
+from collections import OrderedDict
 from discord import utils
 from discord.ext import commands
 from string import ascii_uppercase, digits
@@ -21,6 +24,14 @@ DISCORD_OPERATOR = OP = os.environ.get("DISCORD_OPERATOR") or "!"
 DISCORD_ADMIN = os.environ.get("DISCORD_ADMIN") or "Staff"
 # Discord default channel
 DISCORD_CHANNEL = os.environ.get("DISCORD_CHANNEL") or "general"
+# Discord log levels (application and SQL queries)
+DISCORD_LOG_LEVEL = os.environ.get("DISCORD_LOG_LEVEL") or "DEBUG"
+DISCORD_SQL_LOG_LEVEL = os.environ.get("DISCORD_SQL_LOG_LEVEL") or "WARNING"
+# Discord maximum number of users kept in cache
+DISCORD_CACHE_SIZE = int(os.environ.get("DISCORD_CACHE_SIZE") or 10000)
+
+# Discord mention pattern
+MENTION_REGEX = re.compile(r"<[@!#]+(\d+)>")
 
 
 class Parser(argparse.ArgumentParser):
@@ -34,6 +45,8 @@ class Parser(argparse.ArgumentParser):
         self.message = ""
 
     def parse_args(self, args=None, namespace=None):
+        # Reset message from previous parsing to allow reusing the parser
+        self.message = ""
         result = self.parse_known_args(args, namespace)
         if self.message:
             return
@@ -54,22 +67,42 @@ class Parser(argparse.ArgumentParser):
         pass
 
 
+def get_log_level(name, default):
+    """
+    Get logging level from its name with a fallback for unknown names
+    :param name: Level name
+    :param default: Default level
+    :return: Level
+    """
+    level = getattr(logging, name.upper(), None)
+    return level if isinstance(level, int) else default
+
+
 # Log handler in CLI with date and level
 log_handler = logging.StreamHandler()
 log_handler.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)7s: %(message)s"))
 
 # Log SQL queries
 pw_logger = logging.getLogger("peewee")
-pw_logger.setLevel(logging.DEBUG)
+pw_logger.setLevel(get_log_level(DISCORD_SQL_LOG_LEVEL, logging.WARNING))
 pw_logger.addHandler(log_handler)
 
 # Log application messages
 logger = logging.getLogger("bot")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(get_log_level(DISCORD_LOG_LEVEL, logging.DEBUG))
 logger.addHandler(log_handler)
 
 # Database handler
-database = pw.SqliteDatabase(DISCORD_DATABASE)
+database = pw.SqliteDatabase(
+    DISCORD_DATABASE,
+    pragmas={
+        "journal_mode": "wal",  # Readers do not block writers
+        "synchronous": "normal",  # Still safe with WAL, one less fsync per commit
+        "cache_size": -64 * 1000,  # 64MB page cache
+        "temp_store": "memory",
+        "mmap_size": 256 * 1024 * 1024,  # 256MB memory-mapped I/O
+    },
+)
 
 
 class User(pw.Model):
@@ -90,6 +123,18 @@ class User(pw.Model):
         database = database
 
 
+def create_tables(*cogs):
+    """
+    Create database tables for all cogs at once (must be called before cogs instanciation)
+    :param cogs: Cog classes
+    """
+    models = [User]
+    for cog in cogs:
+        models.extend(cog.MODELS)
+    with database.atomic():
+        database.create_tables(models)
+
+
 class BaseCog(commands.Cog):
     """
     Base Discord Cog with utility functions
@@ -113,28 +158,57 @@ class BaseCog(commands.Cog):
         "9": ":nine:",
         "10": ":keycap_ten:",
     }
+    # Indices icons including letters
+    INDICES_ICONS = {**ICONS, **{letter: f":regional_indicator_{letter.lower()}:" for letter in ascii_uppercase}}
+
+    # Database models used by the cog
+    MODELS = ()
 
-    _users = {}
+    _users = OrderedDict()
+    _members = {}
+    _tasks = set()
 
     def __init__(self, bot):
-        database.create_tables((User,))
         self.bot = bot
         self.users = BaseCog._users
+        self.members = BaseCog._members
+        # Load all known users in cache at once
+        if not self.users:
+            for user in User.select().limit(DISCORD_CACHE_SIZE):
+                self.users[user.id] = user
 
     @commands.Cog.listener()
     async def on_member_update(self, before, after):
+        self.unindex_member(before)
+        self.members[self.get_name(after).lower()] = after
         if not after.bot:
             await self.get_user(after)
 
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.members[self.get_name(member).lower()] = member
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        self.unindex_member(member)
+
+    @commands.Cog.listener("on_ready")
+    async def index_all_members(self):
+        self.index_members(self.bot.get_all_members())
+
+    @commands.Cog.listener("on_guild_join")
+    @commands.Cog.listener("on_guild_available")
+    async def index_guild_members(self, guild):
+        self.index_members(guild.members)
+
     async def cog_command_error(self, context, error):
-        if hasattr(context.message.channel, "name"):
-            await context.author.send(
-                f":warning:  **Erreur :** {error} (`{context.message.content}` on `{context.message.channel.name}`)"
-            )
-            logger.error(f"[{context.message.channel.name}] {error} ({context.message.content})")
+        content, channel = context.message.content, getattr(context.message.channel, "name", None)
+        if channel:
+            await context.author.send(f":warning:  **Erreur :** {error} (`{content}` on `{channel}`)")
+            logger.error(f"[{channel}] {error} ({content})")
         else:
-            await context.author.send(f":warning:  **Erreur :** {error} (`{context.message.content}`)")
-            logger.error(f"{error} ({context.message.content})")
+            await context.author.send(f":warning:  **Erreur :** {error} (`{content}`)")
+            logger.error(f"{error} ({content})")
         raise
 
     async def get_user(self, user):
@@ -147,32 +221,109 @@ class BaseCog(commands.Cog):
             return None
         if isinstance(user, str):
             # Tries to get user id in mention
-            groups = re.match(r"<[@!#]+(\d+)>", user)
+            groups = user.startswith("<") and MENTION_REGEX.match(user)
             if groups:
                 user_id = int(groups[1])
                 user = self.bot.get_user(user_id)
             else:
                 # Search user from its username or nickname
-                user = utils.find(lambda u: user.lower() in (u.nick or u.name).lower(), self.bot.get_all_members())
+                name = user.lower()
+                user = self.members.get(name)
+                if not user:
+                    # Single pass preferring names starting with the search
+                    for key, member in self.members.items():
+                        if key.startswith(name):
+                            user = member
+                            break
+                        if not user and name in key:
+                            user = member
+                if not user:
+                    # Members missing from the index (eg. name shared with another member)
+                    user = utils.find(lambda u: name in self.get_name(u).lower(), self.bot.get_all_members())
+                    if user:
+                        self.index_members((user,))
         if not hasattr(user, "id"):
             # If not a Discord user
             return None
         # Try to get user from cache
-        name = getattr(user, "nick", None) or user.name
+        name = self.get_name(user)
         _user = self.users.get(user.id)
-        # Create user if not exists
+        if _user:
+            self.users.move_to_end(user.id)
+            # Nothing to update for an unchanged cached user
+            if _user.name == name and getattr(_user, "user", None) is user:
+                return _user
+        # Create user if not exists (or update its name) in a single query
         if not _user:
-            _user, created = User.get_or_create(id=user.id, defaults=dict(name=name))
+            query = User.insert(id=user.id, name=name).on_conflict(conflict_target=(User.id,), preserve=(User.name,))
+            await self.run(query.execute)
+            _user = User(id=user.id, name=name)
         # Update user name if changed on Discord
         if name != _user.name:
             _user.name = name
-            _user.save(only=("name",))
+            await self.run(_user.save, only=("name",))
         # Keep Discord user
         _user.user = user
-        # Cache user
+        # Cache user and evict least recently used ones
         self.users[_user.id] = _user
+        while len(self.users) > DISCORD_CACHE_SIZE:
+            self.users.popitem(last=False)
         return _user
 
+    async def run(self, function, *args, **kwargs):
+        """
+        Run a blocking function (eg. database queries) in a thread to avoid blocking the event loop
+        :param function: Function
+        :param args: Positional arguments
+        :param kwargs: Keyword arguments
+        :return: Function result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(function, *args, **kwargs))
+
+    def delete_message(self, message):
+        """
+        Delete a Discord message in background without blocking the command
+        :param message: Discord message
+        :return: Task
+        """
+        task = asyncio.create_task(message.delete())
+        BaseCog._tasks.add(task)  # Keep a reference until the task is done
+        task.add_done_callback(self._on_task_done)
+        return task
+
+    @staticmethod
+    def _on_task_done(task):
+        BaseCog._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Background task failed: {task.exception()}")
+
+    def index_members(self, members):
+        """
+        Add members to the name index without replacing members already indexed under the same name
+        :param members: Discord members
+        """
+        for member in members:
+            self.members.setdefault(self.get_name(member).lower(), member)
+
+    def unindex_member(self, member):
+        """
+        Remove a member from the name index only if its entry belongs to it
+        :param member: Discord member
+        """
+        name = self.get_name(member).lower()
+        indexed = self.members.get(name)
+        if indexed is not None and indexed.id == member.id and indexed.guild == member.guild:
+            del self.members[name]
+
+    def get_name(self, user):
+        """
+        Get display name of a Discord user
+        :param user: Discord user
+        :return: Nickname or username
+        """
+        return getattr(user, "nick", None) or user.name
+
     def get_icon(self, indice):
         """
         Get Discord icon for indice
@@ -181,5 +332,8 @@ class BaseCog(commands.Cog):
         """
         if not indice:
             return "> "
+        icon = self.INDICES_ICONS.get(indice)
+        if icon:
+            return icon
         indice = str(indice)
-        return self.ICONS.get(indice, f":regional_indicator_{indice.lower()}:")
+        return self.INDICES_ICONS.get(indice) or f":regional_indicator_{indice.lower()}:"
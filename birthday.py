@@ -1,12 +1,60 @@
 # coding: utf-8
+import asyncio
 import discord
 import peewee as pw
-from datetime import date, time
+import re
+from datetime import datetime, time, timezone
 from dateutil.parser import parse as parse_date
 from discord.ext import commands, tasks
 from base import DISCORD_CHANNEL, BaseCog, User, database
 
 
+# Any date must contain at least one digit
+DATE_REGEX = re.compile(r"\d")
+# Common date formats (with or without year) parsed before falling back to dateutil
+DATE_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y")
+DAY_FORMATS = ("%d/%m", "%d-%m", "%d.%m")
+
+# Response messages
+MESSAGE_INVALID = ":warning:  La date de naissance saisie n'est pas valide."
+MESSAGE_SAVED = ":white_check_mark:  Votre date de naissance ({}) a bien été enregistrée !"
+MESSAGE_DELETED = ":white_check_mark:  Votre date de naissance a été supprimée !"
+MESSAGE_USAGE = "```usage: {}birthday date```"
+# Maximum length of a Discord message
+MESSAGE_LIMIT = 2000
+
+# Month and day of the birth date (literal SQL so the expression index can be used)
+BIRTH_DAY = pw.SQL("strftime('%m-%d', birth_date)")
+
+
+def get_today():
+    """
+    Get current date in UTC (same timezone as the daily birthday check)
+    :return: Date
+    """
+    return datetime.now(timezone.utc).date()
+
+
+def parse_birth_date(value, today):
+    """
+    Parse a birth date, trying common formats first as dateutil parser is much slower
+    :param value: Date as string
+    :param today: Current date (used when year is missing)
+    :return: Date
+    """
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            pass
+    for date_format in DAY_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date().replace(year=today.year)
+        except ValueError:
+            pass
+    return parse_date(value, dayfirst=True, default=datetime.combine(today, time())).date()
+
+
 class Birthday(pw.Model):
     """
     Birthday
@@ -19,6 +67,10 @@ class Birthday(pw.Model):
 
     class Meta:
         database = database
+        indexes = ((("last_check", "birth_date"), False),)
+
+
+Birthday.add_index(Birthday.index(BIRTH_DAY, name="birthday_birth_day"))
 
 
 class HappyBirthday(BaseCog):
@@ -26,14 +78,26 @@ class HappyBirthday(BaseCog):
     Happy birthday bot
     """
 
+    MODELS = (Birthday,)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        database.create_tables((Birthday,))
+        self.channel_id = None
         self._check_birthday.start()
 
     def cog_unload(self):
         self._check_birthday.cancel()
 
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if DISCORD_CHANNEL in (before.name, after.name):
+            self.channel_id = None
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if channel.name == DISCORD_CHANNEL:
+            self.channel_id = None
+
     @commands.command(name="birthday")
     async def _birthday(self, context, *args):
         """
@@ -41,60 +105,78 @@ class HappyBirthday(BaseCog):
         Usage : `!birthday [<date>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         if args:
+            today = get_today()
             try:
-                birth_date = parse_date(args[0], dayfirst=True).date()
-            except:  # noqa
-                await context.author.send(f":warning:  La date de naissance saisie n'est pas valide.")
+                if not DATE_REGEX.search(args[0]):
+                    raise ValueError(args[0])
+                birth_date = parse_birth_date(args[0], today)
+            except (ValueError, OverflowError):
+                await context.author.send(MESSAGE_INVALID)
                 return
-            today = date.today()
             date_only = birth_date.year == today.year
-            birthday, created = Birthday.get_or_create(
-                user=user, defaults=dict(birth_date=birth_date, date_only=date_only, last_check=today)
+            # Create or update birthday in a single query
+            query = Birthday.insert(
+                user=user.id, birth_date=birth_date, date_only=date_only, last_check=today
+            ).on_conflict(
+                conflict_target=(Birthday.user,),
+                preserve=(Birthday.birth_date, Birthday.date_only, Birthday.last_check),
             )
-            if not created:
-                birthday.birth_date, birthday.date_only, birthday.last_check = birth_date, date_only, today
-                birthday.save(
-                    only=(
-                        "birth_date",
-                        "date_only",
-                    )
-                )
+            await self.run(query.execute)
             birth_date = birth_date.strftime("%d/%m") if date_only else birth_date.strftime("%d/%m/%Y")
-            await context.author.send(
-                f":white_check_mark:  Votre date de naissance ({birth_date}) a bien été engistrée !"
-            )
+            await context.author.send(MESSAGE_SAVED.format(birth_date))
         else:
-            birthday = Birthday.select().where(Birthday.user == user).first()
-            if not birthday:
-                await context.author.send(f"```usage: {context.prefix}birthday date```")
+            deleted = await self.run(Birthday.delete().where(Birthday.user_id == user.id).execute)
+            if not deleted:
+                await context.author.send(MESSAGE_USAGE.format(context.prefix))
                 return
-            birthday.delete_instance()
-            await context.author.send(f":white_check_mark:  Votre date de naissance a été supprimée !")
+            await context.author.send(MESSAGE_DELETED)
 
     @tasks.loop(time=time(0, 0))
     async def _check_birthday(self):
         """
         Event loop to announce birthdays
         """
-        channel = discord.utils.get(self.bot.get_all_channels(), name=DISCORD_CHANNEL)
+        # Get announcement channel (identifier cached until renamed or deleted)
+        channel = self.bot.get_channel(self.channel_id) if self.channel_id else None
         if not channel:
-            return
-        birthdays, today = [], date.today()
-        for birthday in Birthday.select().where(Birthday.last_check < today):
-            if (today.day, today.month) != (birthday.birth_date.day, birthday.birth_date.month):
-                continue
-            if birthday.date_only:
-                birthdays.append(f"<@{birthday.user_id}>")
+            channel = discord.utils.get(self.bot.get_all_channels(), name=DISCORD_CHANNEL)
+            if not channel:
+                return
+            self.channel_id = channel.id
+        birthdays, today = {}, get_today()
+        birthdays_today = (
+            Birthday.select(Birthday.user, Birthday.birth_date, Birthday.date_only)
+            .where((BIRTH_DAY == today.strftime("%m-%d")) & (Birthday.last_check < today))
+            .tuples()
+        )
+        for user_id, birth_date, date_only in await self.run(list, birthdays_today):
+            if date_only:
+                birthdays[user_id] = None
             else:
-                age = int((today - birthday.birth_date).days / 365)
-                birthdays.append(f"<@{birthday.user_id}> ({age} ans)")
-            birthday.last_check = today
-            birthday.save(only=("last_check",))
-        if birthdays:
-            await channel.send(
-                f":birthday:  Nous fêtons **{len(birthdays)}** anniversaire(s) aujourd'hui ! "
-                f"Joyeux anniversaire à {','.join(birthdays)} !"
-            )
+                # Month and day are already matched by the query
+                birthdays[user_id] = today.year - birth_date.year
+        if not birthdays:
+            return
+        # Mark all announced birthdays as checked at once
+        await self.run(Birthday.update(last_check=today).where(Birthday.user.in_(list(birthdays))).execute)
+        # Split mentions in as many messages as needed to stay under the length limit
+        messages, mentions, length = [], [], 0
+        for user_id, age in birthdays.items():
+            mention = f"<@{user_id}>" if age is None else f"<@{user_id}> ({age} ans)"
+            if mentions and length + len(mention) > MESSAGE_LIMIT - 200:
+                messages.append(",".join(mentions))
+                mentions, length = [], 0
+            mentions.append(mention)
+            length += len(mention) + 1
+        messages.append(",".join(mentions) + " !")
+        messages[0] = (
+            f":birthday:  Nous fêtons **{len(birthdays)}** anniversaire(s) aujourd'hui ! "
+            f"Joyeux anniversaire à {messages[0]}"
+        )
+        # First message is sent alone to keep it at the top, the others are sent concurrently
+        await channel.send(messages[0])
+        if len(messages) > 1:
+            await asyncio.gather(*(channel.send(message) for message in messages[1:]))
@@ -1,12 +1,16 @@
 # coding: utf-8
+import asyncio
 import base64
-import discord
 import hashlib
 import hmac
+import multiprocessing
 import peewee as pw
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from discord.ext import commands
-from base import DISCORD_ADMIN, BaseCog, Parser, User, database
+from py3votecore.schulze_method import SchulzeMethod
+from py3votecore.schulze_stv import SchulzeSTV
+from base import DISCORD_ADMIN, DISCORD_OPERATOR, BaseCog, Parser, User, database
 
 
 class Poll(pw.Model):
@@ -29,6 +33,7 @@ class Poll(pw.Model):
 
     class Meta:
         database = database
+        indexes = ((("open_apply", "open_vote"), False),)
 
 
 class Password(pw.Model):
@@ -58,7 +63,10 @@ class Candidate(pw.Model):
 
     class Meta:
         database = database
-        indexes = ((("poll", "user", "proposal"), True),)
+        indexes = (
+            (("poll", "user", "proposal"), True),
+            (("poll", "indice"), False),
+        )
 
 
 class Vote(pw.Model):
@@ -73,7 +81,79 @@ class Vote(pw.Model):
 
     class Meta:
         database = database
-        indexes = ((("user", "poll"), True),)
+        indexes = (
+            (("user", "poll"), True),
+            (("poll", "choices"), False),
+        )
+
+
+# Command parsers
+PASS_PARSER = Parser(
+    prog=f"{DISCORD_OPERATOR}pass",
+    description="Définit un mot de passe pour pouvoir voter anonymement aux scrutins.",
+)
+PASS_PARSER.add_argument("password", type=str, help="Mot de passe (pour l'anonymat)")
+PASS_PARSER.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+
+APPLY_PARSER = Parser(
+    prog=f"{DISCORD_OPERATOR}apply",
+    description="Permet de postuler en tant que candidat au scrutin avec ou sans proposition.",
+)
+APPLY_PARSER.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+APPLY_PARSER.add_argument("--proposal", "-P", type=str, help="Texte de la proposition (si autorisé par le scrutin)")
+
+LEAVE_PARSER = Parser(prog=f"{DISCORD_OPERATOR}leave", description="Permet de retirer sa candidature au scrutin.")
+LEAVE_PARSER.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+LEAVE_PARSER.add_argument("--proposal", "-P", type=int, help="Identifiant de la proposition")
+
+VOTE_PARSER = Parser(prog=f"{DISCORD_OPERATOR}vote", description="")
+VOTE_PARSER.add_argument("password", type=str, help="Mot de passe (pour l'anonymat)")
+VOTE_PARSER.add_argument(
+    "candidates",
+    metavar="candidat",
+    type=str,
+    nargs="+",
+    help="Candidats (par ordre de préférence du plus ou moins apprécié)",
+)
+VOTE_PARSER.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+
+INFO_PARSER = Parser(
+    prog=f"{DISCORD_OPERATOR}info",
+    description="Permet de consulter la liste des candidats au scrutin.",
+)
+INFO_PARSER.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+
+NEW_PARSER = Parser(
+    prog=f"{DISCORD_OPERATOR}new",
+    description="Permet de créer un nouveau scrutin et l'ouvre aux candidatures.",
+)
+NEW_PARSER.add_argument("name", type=str, help="Nom du scrutin")
+NEW_PARSER.add_argument("--winners", "-w", type=int, help="Nombre de vainqueurs")
+NEW_PARSER.add_argument("--proposals", "-p", action="store_true", help="Propositions ?")
+
+OPEN_PARSER = Parser(
+    prog=f"{DISCORD_OPERATOR}open",
+    description="Ferme la soumission des candidatures et ouvre l'accès au vote pour un scrutin.",
+)
+OPEN_PARSER.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+
+CLOSE_PARSER = Parser(
+    prog=f"{DISCORD_OPERATOR}close",
+    description="Ferme le vote à un scrutin et affiche les résultats.",
+)
+CLOSE_PARSER.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+
+
+def compute_results(inputs, winners=1):
+    """
+    Compute Schulze ballot results (executed in a separate process)
+    :param inputs: Ballots with their count
+    :param winners: Number of winners
+    :return: Results
+    """
+    if winners == 1:
+        return SchulzeMethod(inputs, ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING).as_dict()
+    return SchulzeSTV(inputs, required_winners=winners, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING).as_dict()
 
 
 class Condorcet(BaseCog):
@@ -81,16 +161,15 @@ class Condorcet(BaseCog):
     Condorcet voting system bot
     """
 
+    MODELS = (Poll, Password, Candidate, Vote)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        database.create_tables(
-            (
-                Poll,
-                Password,
-                Candidate,
-                Vote,
-            )
-        )
+        self.pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self.indices = {}
+
+    def cog_unload(self):
+        self.pool.shutdown(wait=False)
 
     @commands.command(name="pass")
     async def _pass(self, context, *args):
@@ -99,15 +178,10 @@ class Condorcet(BaseCog):
         Usage : `!pass <password>`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
-        parser = Parser(
-            prog=f"{context.prefix}{context.command.name}",
-            description="Définit un mot de passe pour pouvoir voter anonymement aux scrutins.",
-        )
-        parser.add_argument("password", type=str, help="Mot de passe (pour l'anonymat)")
-        parser.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+        parser = PASS_PARSER
         args = parser.parse_args(args)
         if parser.message:
             await context.author.send(f"```{parser.message}```")
@@ -118,9 +192,8 @@ class Condorcet(BaseCog):
         if not poll:
             return
         # Encoding and saving password for the user
-        password, created = Password.get_or_create(
-            poll=poll, user=user, defaults=dict(password=self.hash(args.password))
-        )
+        hashed = self.hash(args.password)
+        password, created = await self.run(Password.get_or_create, poll=poll, user=user, defaults=dict(password=hashed))
         if not created:
             # If user already has a password
             await context.author.send(":no_entry:  Vous avez déjà défini un mot de passe pour ce scruting.")
@@ -134,15 +207,10 @@ class Condorcet(BaseCog):
         Usage : `!apply [--poll <poll_id> --proposal <text>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
-        parser = Parser(
-            prog=f"{context.prefix}{context.command.name}",
-            description="Permet de postuler en tant que candidat au scrutin avec ou sans proposition.",
-        )
-        parser.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
-        parser.add_argument("--proposal", "-P", type=str, help="Texte de la proposition (si autorisé par le scrutin)")
+        parser = APPLY_PARSER
         args = parser.parse_args(args)
         if parser.message:
             await context.author.send(f"```{parser.message}```")
@@ -161,7 +229,7 @@ class Condorcet(BaseCog):
                     f'vous pouvez le faire en utilisant le paramètre `--proposal "<proposition>"`.'
                 )
                 return
-            candidate, created = Candidate.get_or_create(user=user, poll=poll, proposal=args.proposal)
+            candidate, created = await self.run(self.create_candidate, user=user, poll=poll, proposal=args.proposal)
             if created:
                 await context.author.send(
                     f":white_check_mark:  Votre proposition **{args.proposal}** "
@@ -178,7 +246,7 @@ class Condorcet(BaseCog):
                 f"(`{candidate.id}`) à l'élection de **{poll}** (`{poll.id}`) !"
             )
         else:
-            candidate, created = Candidate.get_or_create(user=user, poll=poll)
+            candidate, created = await self.run(Candidate.get_or_create, user=user, poll=poll)
             if created:
                 await context.author.send(
                     f":white_check_mark:  Vous avez postulé avec succès en tant "
@@ -199,14 +267,10 @@ class Condorcet(BaseCog):
         Usage : `!leave [--poll <poll_id>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
-        parser = Parser(
-            prog=f"{context.prefix}{context.command.name}", description="Permet de retirer sa candidature au scrutin."
-        )
-        parser.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
-        parser.add_argument("--proposal", "-P", type=int, help="Identifiant de la proposition")
+        parser = LEAVE_PARSER
         args = parser.parse_args(args)
         if parser.message:
             await context.author.send(f"```{parser.message}```")
@@ -225,9 +289,9 @@ class Condorcet(BaseCog):
                     f"proposition à retirer à l'aide du paramètre `--proposal <id>`."
                 )
                 return
-            candidate = Candidate.get_or_none(user=user, poll=poll, id=args.proposal)
+            candidate = await self.run(Candidate.get_or_none, user=user, poll=poll, id=args.proposal)
             if candidate:
-                candidate.delete_instance()
+                await self.run(candidate.delete_instance)
                 await context.author.send(
                     f":white_check_mark:  Vous avez retiré avec succès votre proposition "
                     f"**{candidate.proposal}** au scrutin de **{poll}** (`{poll.id}`) !"
@@ -242,9 +306,9 @@ class Condorcet(BaseCog):
                 f":no_entry:  Vous n'avez pas cette proposition à l'élection de **{poll}** (`{poll.id}`) !"
             )
         else:
-            candidate = Candidate.get_or_none(user=user, poll=poll)
+            candidate = await self.run(Candidate.get_or_none, user=user, poll=poll)
             if candidate:
-                candidate.delete_instance()
+                await self.run(candidate.delete_instance)
                 await context.author.send(
                     f":white_check_mark:  Vous vous êtes retiré avec succès en tant "
                     f"que candidat à l'élection de **{poll}** !"
@@ -265,47 +329,38 @@ class Condorcet(BaseCog):
         Usage : `!vote <candidat> [<candidat> ...] --password <password> [--poll <poll_id>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
-        parser = Parser(prog=f"{context.prefix}{context.command.name}", description="")
-        parser.add_argument("password", type=str, help="Mot de passe (pour l'anonymat)")
-        parser.add_argument(
-            "candidates",
-            metavar="candidat",
-            type=str,
-            nargs="+",
-            help="Candidats (par ordre de préférence du plus ou moins apprécié)",
-        )
-        parser.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+        parser = VOTE_PARSER
         args = parser.parse_args(args)
         if parser.message:
             await context.author.send(f"```{parser.message}```")
             return
+        # Reject duplicated candidates before any query
+        candidates = list(map(str.upper, args.candidates))
+        if len(set(candidates)) != len(candidates):
+            await context.author.send(f":no_entry:  Vous avez sélectionné plusieurs fois le même candidat !")
+            return
         # Get active and votable polls
         polls = Poll.select().where(~Poll.open_apply & Poll.open_vote)
         poll = await self.handle_poll(polls, args, context.author)
         if not poll:
             return
         # Check if all candidates where selected and sorted
-        candidates = list(map(str.upper, args.candidates))
-        possibles = (
-            Candidate.select(Candidate.indice)
-            .where(Candidate.indice.is_null(False) & (Candidate.poll == poll))
-            .order_by(Candidate.indice.asc())
-        )
-        possibles = {c.indice for c in possibles}
-        if possibles != set(candidates) or len(possibles) != len(candidates):
+        possibles = self.indices.get(poll.id)
+        if possibles is None:
+            possibles = self.indices[poll.id] = await self.run(self.get_indices, poll)
+        if possibles != set(candidates):
             await context.author.send(
                 f":no_entry:  Vous n'avez pas sélectionné et/ou classé l'ensemble des candidats !"
             )
             return
         # Create new password for user
-        password, created = Password.get_or_create(
-            poll=poll, user=user, defaults=dict(password=self.hash(args.password))
-        )
+        hashed = self.hash(args.password)
+        password, created = await self.run(Password.get_or_create, poll=poll, user=user, defaults=dict(password=hashed))
         # ... or verify user password
-        if not created and self.hash(args.password) != password.password:
+        if not created and not hmac.compare_digest(hashed, password.password or ""):
             await context.author.send(
                 f":no_entry:  Votre mot de passe de scrutin est incorrect ou n'a pas encore configuré, "
                 f"utilisez la commande `{context.prefix}pass` pour le définir !"
@@ -313,10 +368,10 @@ class Condorcet(BaseCog):
             return
         # Encrypt user with password and save vote choices
         encrypted, choices = self.encrypt(args.password, user.id), " ".join(candidates)
-        vote, created = Vote.get_or_create(user=encrypted, poll=poll, defaults=dict(choices=choices))
+        vote, created = await self.run(Vote.get_or_create, user=encrypted, poll=poll, defaults=dict(choices=choices))
         if not created:
             vote.choices = choices
-            vote.save(only=("choices",))
+            await self.run(vote.save, only=("choices",))
         await context.author.send(f":ballot_box:  Merci pour votre vote !")
 
     @commands.command(name="info")
@@ -326,14 +381,10 @@ class Condorcet(BaseCog):
         Usage : `!info [--poll <poll_id>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
-        parser = Parser(
-            prog=f"{context.prefix}{context.command.name}",
-            description="Permet de consulter la liste des candidats au scrutin.",
-        )
-        parser.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+        parser = INFO_PARSER
         args = parser.parse_args(args)
         if parser.message:
             await context.author.send(f"```{parser.message}```")
@@ -344,18 +395,26 @@ class Condorcet(BaseCog):
         if not poll:
             return
         # Build message
-        message = [f"Voici la liste des candidats actuels au scrutin **{poll}** (`{poll.id}`) :"]
-        candidates = Candidate.select(Candidate, User).join(User).order_by(Candidate.indice.asc(), User.name.asc())
-        for candidate in candidates:
-            if poll.proposals:
-                message.append(
-                    f"{self.get_icon(candidate.indice)}  **{candidate.proposal}** (par {candidate.user.name})"
+        candidates = (
+            Candidate.select(Candidate.indice, Candidate.proposal, User.name)
+            .join(User)
+            .where(Candidate.poll == poll)
+            .order_by(Candidate.indice.asc(), User.name.asc())
+            .dicts()
+        )
+        message = "\n".join(
+            [f"Voici la liste des candidats actuels au scrutin **{poll}** (`{poll.id}`) :"]
+            + [
+                (
+                    f"{self.get_icon(candidate['indice'])}  **{candidate['proposal']}** (par {candidate['name']})"
+                    if poll.proposals
+                    else f"{self.get_icon(candidate['indice'])}  **{candidate['name']}**"
                 )
-            else:
-                message.append(f"{self.get_icon(candidate.indice)}  **{candidate.user.name}**")
-        message = "\n".join(message)
+                for candidate in await self.run(lambda: list(candidates.iterator()))
+            ]
+        )
         # Send message
-        is_admin = any(role.name == DISCORD_ADMIN for role in context.author.roles)
+        is_admin = DISCORD_ADMIN in {role.name for role in getattr(context.author, "roles", ())}
         if is_admin and hasattr(context.channel, "name"):
             channel = poll.channel or context.channel
             await channel.send(message)
@@ -370,22 +429,16 @@ class Condorcet(BaseCog):
         Usage : `!new <name> [--winners <count> --proposals]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
-        parser = Parser(
-            prog=f"{context.prefix}{context.command.name}",
-            description="Permet de créer un nouveau scrutin et l'ouvre aux candidatures.",
-        )
-        parser.add_argument("name", type=str, help="Nom du scrutin")
-        parser.add_argument("--winners", "-w", type=int, help="Nombre de vainqueurs")
-        parser.add_argument("--proposals", "-p", action="store_true", help="Propositions ?")
+        parser = NEW_PARSER
         args = parser.parse_args(args)
         if parser.message:
             await context.author.send(f"```{parser.message}```")
             return
         # Create new poll
-        poll = Poll.create(name=args.name, winners=args.winners or 1, proposals=args.proposals)
+        poll = await self.run(Poll.create, name=args.name, winners=args.winners or 1, proposals=args.proposals)
         # Message to user/channel
         message = (
             f":ballot_box:  Le scrutin **{poll}** (`{poll.id}`) a été créé et ouvert aux candidatures, "
@@ -395,7 +448,7 @@ class Condorcet(BaseCog):
         if hasattr(context.channel, "name"):
             # Save channel for announcements
             poll.channel_id = context.channel.id
-            poll.save(only=("channel_id",))
+            await self.run(poll.save, only=("channel_id",))
             await context.channel.send(message)
         else:
             await context.author.send(message)
@@ -408,14 +461,10 @@ class Condorcet(BaseCog):
         Usage : `!open [--poll <poll_id>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
-        parser = Parser(
-            prog=f"{context.prefix}{context.command.name}",
-            description="Ferme la soumission des candidatures et ouvre l'accès au vote pour un scrutin.",
-        )
-        parser.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+        parser = OPEN_PARSER
         args = parser.parse_args(args)
         if parser.message:
             await context.author.send(f"```{parser.message}```")
@@ -426,14 +475,20 @@ class Condorcet(BaseCog):
         if not poll:
             return
         channel = poll.channel or context.channel
+        # Every candidate must get an indice
+        count = await self.run(Candidate.select().where(Candidate.poll == poll).count)
+        if count > len(self.INDICES):
+            await context.author.send(
+                f":no_entry:  Le scrutin **{poll}** (`{poll.id}`) compte trop de candidats ({count}) "
+                f"pour ouvrir les votes, le maximum est de {len(self.INDICES)} !"
+            )
+            return
         # Update poll
         poll.open_apply = False
         poll.open_vote = True
-        poll.save(only=("open_apply", "open_vote"))
+        await self.run(poll.save, only=("open_apply", "open_vote"))
         # Assign letter to every candidate
-        for i, candidate in enumerate(Candidate.select(Candidate, User).join(User).order_by(User.name.asc())):
-            candidate.indice = self.INDICES[i]
-            candidate.save(only=("indice",))
+        self.indices[poll.id] = await self.run(self.set_indices, poll)
         # Message to user/channel
         message = (
             f":ballot_box:  Les candidatures au scrutin **{poll}** (`{poll.id}`) "
@@ -453,14 +508,10 @@ class Condorcet(BaseCog):
         Usage : `!close [--poll <poll_id>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
-        parser = Parser(
-            prog=f"{context.prefix}{context.command.name}",
-            description="Ferme le vote à un scrutin et affiche les résultats.",
-        )
-        parser.add_argument("--poll", "-p", type=str, help="Identifiant de scrutin")
+        parser = CLOSE_PARSER
         args = parser.parse_args(args)
         if parser.message:
             await context.author.send(f"```{parser.message}```")
@@ -474,26 +525,31 @@ class Condorcet(BaseCog):
         # Update poll
         poll.open_apply = False
         poll.open_vote = False
-        poll.save(only=("open_apply", "open_vote"))
+        await self.run(poll.save, only=("open_apply", "open_vote"))
+        self.indices.pop(poll.id, None)
         # Compute results
-        self.get_results(poll, save=True)
+        await self.get_results(poll, save=True)
         # Display winners
-        votes = Vote.select(Vote.id).where(Vote.poll == poll).count()  # Count total votes
-        candidates = Candidate.select(Candidate.id).where(Candidate.poll == poll).count()  # Count total candidates
+        counts = Poll.select(
+            Vote.select(pw.fn.COUNT(Vote.id)).where(Vote.poll == poll),  # Count total votes
+            Candidate.select(pw.fn.COUNT(Candidate.id)).where(Candidate.poll == poll),  # Count total candidates
+        ).where(Poll.id == poll.id)
+        votes, candidates = await self.run(counts.scalar, as_tuple=True)
         winners = (
-            Candidate.select(Candidate, User)
+            Candidate.select(Candidate.indice, Candidate.proposal, Candidate.user.alias("user_id"))
             .join(User)
             .where(Candidate.poll == poll, Candidate.winner)
             .order_by(Candidate.proposal.asc(), User.name.asc())
+            .dicts()
         )
         winners = ", ".join(
             [
                 (
-                    f"{self.get_icon(winner.indice)}  **{winner.proposal}** (par <@{winner.user_id}>)"
+                    f"{self.get_icon(winner['indice'])}  **{winner['proposal']}** (par <@{winner['user_id']}>)"
                     if poll.proposals
-                    else f"{self.get_icon(winner.indice)}  <@{winner.user_id}>"
+                    else f"{self.get_icon(winner['indice'])}  <@{winner['user_id']}>"
                 )
-                for winner in winners
+                for winner in await self.run(list, winners)
             ]
         )
         message = (
@@ -517,10 +573,9 @@ class Condorcet(BaseCog):
         :param messages: Messages to encrypt
         :return: Base64 encrypted string
         """
-        encrypted = hmac.new(key=str(password).encode(), digestmod=hashlib.sha256)
-        for message in messages:
-            encrypted.update(str(message).encode())
-        return base64.urlsafe_b64encode(encrypted.digest()).decode()
+        message = "".join(map(str, messages)).encode()
+        encrypted = hmac.digest(str(password).encode(), message, hashlib.sha256)
+        return base64.urlsafe_b64encode(encrypted).decode()
 
     def hash(self, *messages):
         """
@@ -528,9 +583,7 @@ class Condorcet(BaseCog):
         :param messages: Messages to hash
         :return: Base64 hashed string
         """
-        hashed = hashlib.sha256()
-        for message in messages:
-            hashed.update(str(message).encode())
+        hashed = hashlib.sha256("".join(map(str, messages)).encode())
         return base64.urlsafe_b64encode(hashed.digest()).decode()
 
     async def handle_poll(self, polls, args, author):
@@ -542,18 +595,22 @@ class Condorcet(BaseCog):
         :return: Poll instance or nothing
         """
         if not args.poll:
-            # If there is more than 1 poll
-            if polls.count() > 1:
+            # Fetch at most 2 polls to know if there is more than 1 poll
+            polls = await self.run(list, polls.limit(2))
+            if len(polls) > 1:
                 await author.send(
                     f":warning:  Il y a actuellement plus d'un scrutin en cours. "
                     f"Veuillez fournir un identifiant de scrutin via l'argument `--poll`."
                 )
                 return
             # Get the only poll available
-            poll = polls.first()
+            poll = polls[0] if polls else None
+        elif not args.poll.isdecimal():
+            # Poll identifier can't be valid
+            poll = None
         else:
             # Get the targetted poll
-            poll = polls.where(Poll.id == args.poll).first()
+            poll = await self.run(polls.where(Poll.id == int(args.poll)).get_or_none)
         if not poll:
             await author.send(
                 f":no_entry:  Aucun scrutin n'est ouvert à cette "
@@ -561,39 +618,81 @@ class Condorcet(BaseCog):
             )
             return
         # Get Discord channel
-        poll.channel = (
-            None if not poll.channel_id else (discord.utils.get(self.bot.get_all_channels(), id=poll.channel_id))
-        )
+        poll.channel = self.bot.get_channel(poll.channel_id) if poll.channel_id else None
         return poll
 
-    def get_results(self, poll, save=False):
+    def create_candidate(self, **fields):
+        """
+        Create a candidate in a single query if it does not exist yet
+        (only for proposals as NULL values are not covered by the unique index)
+        :param fields: Candidate fields
+        :return: Candidate and creation flag
+        """
+        cursor = database.execute(Candidate.insert(**fields).on_conflict_ignore())
+        if cursor.rowcount:
+            return Candidate(id=cursor.lastrowid, **fields), True
+        return Candidate.get(**fields), False
+
+    def get_indices(self, poll):
+        """
+        Get indices of all candidates of the poll
+        :param poll: Poll instance
+        :return: Indices
+        """
+        candidates = Candidate.select(Candidate.indice).where(
+            Candidate.indice.is_null(False) & (Candidate.poll == poll)
+        )
+        return frozenset(indice for indice, in candidates.tuples())
+
+    def set_indices(self, poll):
+        """
+        Assign an indice to every candidate of the poll
+        :param poll: Poll instance
+        :return: Indices
+        """
+        candidates = list(
+            Candidate.select(Candidate.id).join(User).where(Candidate.poll == poll).order_by(User.name.asc())
+        )
+        for indice, candidate in zip(self.INDICES, candidates):
+            candidate.indice = indice
+        if candidates:
+            with database.atomic():
+                Candidate.bulk_update(candidates, fields=(Candidate.indice,))
+        return frozenset(candidate.indice for candidate in candidates if candidate.indice)
+
+    async def get_results(self, poll, save=False):
         """
         Compute Schulze ballot results
         :param poll: Poll instance
         :param save: Save results
         :return: Results
         """
-        votes = {}
-        for vote in Vote.select().where(Vote.poll == poll):
-            votes.setdefault(vote.choices, 0)
-            votes[vote.choices] += 1
+        inputs = await self.run(self.get_ballots, poll)
+        # Schulze computation is CPU-bound so it runs in a separate process
+        loop = asyncio.get_running_loop()
+        outputs = await loop.run_in_executor(self.pool, compute_results, inputs, poll.winners)
+        if save:
+            await self.run(self.set_winners, poll, outputs)
+        return outputs
+
+    def get_ballots(self, poll):
+        """
+        Get ballots of a poll with their count
+        :param poll: Poll instance
+        :return: Ballots
+        """
+        votes = Vote.select(Vote.choices, pw.fn.COUNT(Vote.id)).where(Vote.poll == poll).group_by(Vote.choices).tuples()
         inputs = []
-        for choices, count in votes.items():
+        for choices, count in votes.iterator():
             inputs.append(dict(count=count, ballot=[[choice] for choice in choices.split()]))
-        if poll.winners == 1:
-            from py3votecore.schulze_method import SchulzeMethod
+        return inputs
 
-            outputs = SchulzeMethod(inputs, ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING).as_dict()
-            if save:
-                winner = outputs["winner"]
-                Candidate.update(winner=True).where(Candidate.poll == poll, Candidate.indice == winner).execute()
-        else:
-            from py3votecore.schulze_stv import SchulzeSTV
-
-            outputs = SchulzeSTV(
-                inputs, required_winners=poll.winners, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING
-            ).as_dict()
-            if save:
-                winners = outputs["winners"]
-                Candidate.update(winner=True).where(Candidate.poll == poll, Candidate.indice.in_(winners)).execute()
-        return outputs
+    def set_winners(self, poll, outputs):
+        """
+        Save winners of a poll
+        :param poll: Poll instance
+        :param outputs: Results
+        :return: Nothing
+        """
+        winners = [outputs["winner"]] if poll.winners == 1 else outputs["winners"]
+        Candidate.update(winner=True).where(Candidate.poll == poll, Candidate.indice.in_(winners)).execute()
@@ -91,9 +91,10 @@ class Economy(BaseCog):
     Economy system bot
     """
 
+    MODELS = (Currency, Balance, LotoDraw, LotoGrid)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        database.create_tables((Currency, Balance, LotoDraw, LotoGrid))
         Currency.get_or_create(symbol=DISCORD_MONEY_SYMBOL, name=DISCORD_MONEY_NAME)
         LotoDraw.get_or_create(defaults=dict(value=DISCORD_LOTO_START))
         self.currencies = {}
@@ -116,15 +117,15 @@ class Economy(BaseCog):
         """
         if message.author.bot or not message.guild:
             return
-        user = await self.get_user(message.author)
         value = round(len(escape_mentions(message.content).split()) * DISCORD_MONEY_MULT, 5)
         if value <= 0.0:
             return
+        user = await self.get_user(message.author)
         symbol, name = DISCORD_MONEY_SYMBOL, DISCORD_MONEY_NAME
         currency = self.get_currency(symbol, create=True, name=name)
         balance = self.get_balance(user, currency)
         balance.value += value
-        Balance.update(value=Balance.value + value).where(Balance.id == balance.id).execute()
+        await self.run(Balance.update(value=Balance.value + value).where(Balance.id == balance.id).execute)
 
     @commands.command(name="give")
     async def _give(self, context, *args):
@@ -133,7 +134,7 @@ class Economy(BaseCog):
         Usage : `!give <montant> <symbole> <utilisateur>`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -208,7 +209,7 @@ class Economy(BaseCog):
         Usage : `!store <symbole> <montant>`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -261,7 +262,7 @@ class Economy(BaseCog):
         Usage : `!create <symbole> "<nom>" [<montant>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -312,7 +313,7 @@ class Economy(BaseCog):
         Usage : `!rename <symbole> "<nom>"`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -344,7 +345,7 @@ class Economy(BaseCog):
         Usage : `!delete <symbole>`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -383,7 +384,7 @@ class Economy(BaseCog):
         Usage : `!rate <symbole>`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -446,7 +447,7 @@ class Economy(BaseCog):
         Usage : `!money [<utilisateur>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -494,7 +495,7 @@ class Economy(BaseCog):
         Usage : `!market [<utilisateur>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -564,7 +565,7 @@ class Economy(BaseCog):
         Usage : `!sell <montant> <symbole>`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -631,7 +632,7 @@ class Economy(BaseCog):
         Usage : `!buy <nombre> <symbol>`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -701,7 +702,7 @@ class Economy(BaseCog):
         Usage : `!slot <montant> [<symbole>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -799,7 +800,7 @@ class Economy(BaseCog):
         Usage : `!price`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -826,7 +827,7 @@ class Economy(BaseCog):
         Usage : `!loto <nombre> <nombre> <nombre> <nombre> <nombre>`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -923,7 +924,7 @@ class Economy(BaseCog):
         Usage : `!seed [<nombre>]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Argument parser
         parser = Parser(
@@ -951,7 +952,7 @@ class Economy(BaseCog):
         """
         if context and context.channel and hasattr(context.channel, "name"):
             channel = context.channel
-            await context.message.delete()
+            self.delete_message(context.message)
         else:
             channel = discord.utils.get(self.bot.get_all_channels(), name=DISCORD_LOTO_CHANNEL)
             if not channel:
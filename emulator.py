@@ -93,7 +93,7 @@ class Emulator(BaseCog):
         Permet de changer l'heure dans le jeu (Pokemon uniquement, format [<jour:0-6>] <heures>:<minutes>)
         """
         if context and context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         if not GAME_USE_CLOCK:
             await context.author.send(":no_entry:  Ce jeu n'utilise pas d'horloge interne !")
             return
@@ -127,7 +127,7 @@ class Emulator(BaseCog):
         Permet de sauvegarder l'état du jeu dans une savestate
         """
         if context and context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         if not filename:
             return
         os.makedirs("saves", exist_ok=True)
@@ -142,7 +142,7 @@ class Emulator(BaseCog):
         Permet de charger l'état du jeu depuis une savestate
         """
         if context and context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         if not filename:
             return
         os.makedirs("saves", exist_ok=True)
@@ -165,7 +165,7 @@ class Emulator(BaseCog):
         Permet de modifier la mémoire pendant l'exécution
         """
         if context and context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         if not self.game:
             return
         address, value = (value.split() + [None])[:2]
@@ -182,7 +182,7 @@ class Emulator(BaseCog):
         Permet d'exécuter une séquence de touches dans le jeu
         """
         if context and context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         if not keys:
             return
         self.screenshots = []
@@ -90,9 +90,10 @@ class Coordinates:
 
 
 class Geoguessr(BaseCog):
+    MODELS = (Place, Guess)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        database.create_tables((Place, Guess))
         self.world = gpd.read_file(WORLD_DATA)
         self.current, self.last_message = None, None
         self._new_place.start()
@@ -108,7 +109,7 @@ class Geoguessr(BaseCog):
         Permet de fournir une proposition à l'énigme Geoguessr du jour
         """
         if context and context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         place = Place.select().order_by(Place.date.desc()).first()
         if not place:
@@ -148,7 +149,7 @@ class Geoguessr(BaseCog):
         Permet de forcer une nouvelle énigme Geoguessr
         """
         if context and context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         channel = discord.utils.get(self.bot.get_all_channels(), name=GEOGUESSR_CHANNEL)
         if not channel:
             return
@@ -199,7 +200,7 @@ class Geoguessr(BaseCog):
         Permet de forcer un indice pour l'énigme Geoguessr du jour
         """
         if context and context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         channel = discord.utils.get(self.bot.get_all_channels(), name=GEOGUESSR_CHANNEL)
         if not channel:
             return
@@ -7,6 +7,8 @@ from base import BaseCog, Parser
 
 # Discord roles allowed to be granted to users
 DISCORD_ROLES = os.environ.get("DISCORD_ROLES")
+# Allowed roles as (shortcut, role name) pairs
+ROLES = tuple(tuple(role.split("=")) for role in DISCORD_ROLES.split(",")) if DISCORD_ROLES else ()
 
 
 class RoleManager(BaseCog):
@@ -22,11 +24,10 @@ class RoleManager(BaseCog):
         Usage : `!roles <role> [<role> ...]`
         """
         if context.channel and hasattr(context.channel, "name"):
-            await context.message.delete()
+            self.delete_message(context.message)
         user = await self.get_user(context.author)
         # Get roles
-        list_roles = [r.split("=") for r in DISCORD_ROLES.split(",")] if DISCORD_ROLES else []
-        help_roles = ",\n".join(f"- {rolename} ({shortcut})" for (shortcut, rolename) in list_roles)
+        help_roles = ",\n".join(f"- {rolename} ({shortcut})" for (shortcut, rolename) in ROLES)
         # Argument parser
         parser = Parser(
             prog=f"{context.prefix}{context.command.name}",
@@ -40,27 +41,24 @@ class RoleManager(BaseCog):
             await context.author.send(f"```{parser.message}```")
             return
         # Collect all allowed roles
-        roles = {}
-        for role in context.guild.roles:
-            for shortcut, rolename in list_roles:
-                if role.name.lower() == rolename.lower():
-                    roles[shortcut] = role
+        guild_roles = {role.name.lower(): role for role in context.guild.roles}
+        roles = {
+            shortcut: guild_roles[rolename.lower()] for shortcut, rolename in ROLES if rolename.lower() in guild_roles
+        }
         # Collect selected roles
-        new_roles = []
-        selected_roles = map(str.lower, args.roles)
-        for shortcut, role in roles.items():
-            if shortcut.lower() in selected_roles:
-                new_roles.append(role)
-            elif role.name.lower() in selected_roles:
-                new_roles.append(role)
+        selected_roles = frozenset(map(str.lower, args.roles))
+        new_roles = [
+            role
+            for shortcut, role in roles.items()
+            if shortcut.lower() in selected_roles or role.name.lower() in selected_roles
+        ]
         if not new_roles:
-            help_roles = ", ".join(f"**{rolename}** ({shortcut})" for (shortcut, rolename) in list_roles)
+            help_roles = ", ".join(f"**{rolename}** ({shortcut})" for (shortcut, rolename) in ROLES)
             await context.author.send(f":warning:  Vous devez sélectionner un ou plusieurs rôles parmi : {help_roles}")
             return
-        # Clear roles
-        old_roles = list(roles.values())
-        await context.author.remove_roles(*old_roles)
-        # Add roles
-        await context.author.add_roles(*new_roles)
+        # Replace allowed roles by selected ones in a single request (ignoring @everyone)
+        old_roles = set(roles.values())
+        other_roles = [role for role in context.author.roles[1:] if role not in old_roles]
+        await context.author.edit(roles=other_roles + new_roles)
         role_names = ", ".join(role.name for role in new_roles)
         await context.author.send(f":scroll:  Vous avez désormais accès aux rôles suivants : **{role_names}** !")
@@ -3,7 +3,7 @@ import locale
 
 from discord import Intents
 from discord.ext import commands
-from base import DISCORD_LOCALE, DISCORD_OPERATOR, DISCORD_TOKEN
+from base import DISCORD_LOCALE, DISCORD_OPERATOR, DISCORD_TOKEN, create_tables
 from condorcet import Condorcet
 from birthday import HappyBirthday
 from rolemanager import RoleManager
@@ -19,6 +19,7 @@ if __name__ == "__main__":
     intents.members = True
     intents.presences = True
     bot = commands.Bot(command_prefix=DISCORD_OPERATOR, intents=intents)
+    create_tables(Condorcet, HappyBirthday, RoleManager, Economy, Emulator, Geoguessr)
     bot.add_cog(Condorcet(bot))
     bot.add_cog(HappyBirthday(bot))
     bot.add_cog(RoleManager(bot))